@@ -0,0 +1,1421 @@
+#!/usr/bin/env python3
+"""
+Scalix License Management Benchmarks
+====================================
+
+Measurements for the Scalix Pro license manager. Each scenario builds a
+synthetic license fleet in a temporary directory, so nothing touches the
+real `scalix_licenses.json`.
+
+Usage:
+    python scalix_license_benchmark.py startup --licenses 100000
+    python scalix_license_benchmark.py usage --events 1000000
+    python scalix_license_benchmark.py analytics --licenses 100000
+    python scalix_license_benchmark.py retention
+    python scalix_license_benchmark.py event-log --checks 200000
+    python scalix_license_benchmark.py export --licenses 10000 100000
+    python scalix_license_benchmark.py search --licenses 10000 100000
+    python scalix_license_benchmark.py provisioning --seats 1000 10000 100000
+    python scalix_license_benchmark.py bulk-update --licenses 10000 100000
+    python scalix_license_benchmark.py suite --licenses 1000 100000 1000000 --output results.json
+    python scalix_license_benchmark.py suite --baseline baseline.json --threshold 0.15
+    python scalix_license_benchmark.py metrics --licenses 10000 --operations 50000
+    python scalix_license_benchmark.py stress --threads 32 --operations 2000
+    python scalix_license_benchmark.py sharded --workers 1 2 4 --licenses 20000
+    python scalix_license_benchmark.py serving --clients 16 --write-delay-ms 50
+    python scalix_license_benchmark.py online --clients 32 --latency-ms 20
+    python scalix_license_benchmark.py resilience --slow-latency-ms 2000
+
+Author: Scalix AI Team
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime, timedelta
+from typing import List
+
+from scalix_license_management import (
+    LICENSE_SERVER_VALIDATE_PATH, Counter, EntitlementMatrix, FeatureAccess, FeatureUsage, FeatureUsageLog,
+    Histogram, LicenseASGIApp, LicenseServerClient, LicenseServerError, LicenseTier, LocalLicenseServer,
+    ScalixLicenseDashboard, ScalixLicenseManager, ShardedLicenseService, ShardRouter, UsageEventSink
+)
+
+logging.getLogger("scalix_license_management").setLevel(logging.ERROR)
+
+# ============================================================================
+# SYNTHETIC FLEETS
+# ============================================================================
+
+def synthetic_license_records(count: int):
+    """Yield serialized licenses with a mix of tiers, expiries and usage"""
+    now = datetime.now()
+    tiers = [LicenseTier.PRO_MONTHLY, LicenseTier.PRO_MONTHLY, LicenseTier.PRO_YEARLY, LicenseTier.ENTERPRISE]
+    for i in range(count):
+        tier = tiers[i % len(tiers)]
+        activated_at = now - timedelta(days=i % 400)
+        yield {
+            "license_key": f"SCALIX-{tier.value.upper()}-{i:016X}",
+            "tier": tier.value,
+            "email": f"user{i}@example.com",
+            "device_id": f"{i:016x}",
+            "activated_at": activated_at.isoformat(),
+            "expires_at": (activated_at + timedelta(days=365 if tier == LicenseTier.PRO_YEARLY else 30)).isoformat(),
+            "last_validated": now.isoformat(),
+            "is_active": i % 50 != 0,
+            "usage_count": i % 1000,
+            "features_used": ["turbo_edits", "smart_context"] if i % 3 == 0 else [],
+            "metadata": {"source": "benchmark"} if i % 5 == 0 else {},
+        }
+
+def write_fleet_file(path: str, count: int):
+    """Write a synthetic fleet in the JSON format used by JsonLicenseStore"""
+    with open(path, "w") as f:
+        json.dump({"licenses": list(synthetic_license_records(count)), "device_id": "benchmark"}, f)
+
+# ============================================================================
+# STARTUP: EAGER VS LAZY LOADING
+# ============================================================================
+
+def current_rss_mb() -> float:
+    """Resident set size of this process (Linux), or 0 when unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        return 0.0
+
+def probe_startup(data_file: str, lazy_load: bool) -> dict:
+    """Load a manager in this process and report load time, peak RSS and hydrated records"""
+    start = time.perf_counter()
+    manager = ScalixLicenseManager(data_file, lazy_load=lazy_load)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager.get_license_analytics()
+    analytics_seconds = time.perf_counter() - start
+
+    hydrated = getattr(manager.licenses, "hydrated_count", len(manager.licenses))
+    return {
+        "lazy_load": lazy_load,
+        "licenses": len(manager.licenses),
+        "load_seconds": round(load_seconds, 4),
+        "analytics_seconds": round(analytics_seconds, 4),
+        "hydrated_after_analytics": hydrated,
+        "rss_mb": current_rss_mb(),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def run_startup(count: int):
+    """Compare eager and lazy loading, each in a fresh process so RSS is not shared"""
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "licenses.json")
+        write_fleet_file(data_file, count)
+
+        results = []
+        for lazy_load in (False, True):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_probe-startup", data_file]
+                + (["--lazy"] if lazy_load else []),
+                cwd=workdir, capture_output=True, text=True, check=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Startup with {count} licenses")
+    print(f"{'mode':<8} {'load s':>10} {'analytics s':>12} {'hydrated':>10} {'RSS MB':>10} {'peak RSS MB':>12}")
+    for result in results:
+        mode = "lazy" if result["lazy_load"] else "eager"
+        print(f"{mode:<8} {result['load_seconds']:>10} {result['analytics_seconds']:>12} "
+              f"{result['hydrated_after_analytics']:>10} {result['rss_mb']:>10} {result['peak_rss_mb']:>12}")
+    return results
+
+# ============================================================================
+# USAGE EVENTS: OBJECT LIST VS COLUMNAR LOG
+# ============================================================================
+
+def synthetic_usage_events(count: int, fleet_size: int = 10000):
+    """Yield (license_key, feature) pairs spread over a fleet"""
+    features = list(FeatureAccess)
+    for i in range(count):
+        yield f"SCALIX-PRO_MONTHLY-{i % fleet_size:016X}", features[i % len(features)]
+
+def _traced_bytes(build) -> tuple:
+    """Run `build` under tracemalloc; returns (result, bytes still allocated, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, seconds
+
+def run_usage(count: int):
+    """Bytes per event for the former FeatureUsage list and the columnar FeatureUsageLog"""
+    def build_list():
+        # Mirrors the former _track_feature_usage: one dataclass and metadata dict per event
+        records = []
+        for license_key, feature in synthetic_usage_events(count):
+            records.append(FeatureUsage(
+                license_key=license_key,
+                feature=feature,
+                timestamp=datetime.now(),
+                session_id=secrets.token_hex(8),
+                metadata={"device_id": "benchmark", "platform": platform.system(), "version": "1.0.0"}
+            ))
+        return records
+
+    def build_log():
+        log = FeatureUsageLog(EntitlementMatrix(), "benchmark")
+        for license_key, feature in synthetic_usage_events(count):
+            log.append(license_key, feature)
+        return log
+
+    results = []
+    for name, build in (("list", build_list), ("columnar", build_log)):
+        store, allocated, seconds = _traced_bytes(build)
+        results.append({
+            "store": name,
+            "events": len(store),
+            "bytes_per_event": round(allocated / count, 1),
+            "append_us": round(seconds / count * 1e6, 2),
+        })
+        del store
+
+    print(f"Usage tracking with {count} events")
+    print(f"{'store':<10} {'bytes/event':>12} {'append us':>10}")
+    for result in results:
+        print(f"{result['store']:<10} {result['bytes_per_event']:>12} {result['append_us']:>10}")
+    return results
+
+def run_event_log(checks: int = 200000, licenses: int = 1000):
+    """
+    Feature check latency with and without the durable usage event log,
+    plus its on-disk size and the speed of replaying it at startup
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, event_dir in (("memory only", None), ("event log", os.path.join(workdir, "events"))):
+            data_file = os.path.join(workdir, f"{name.replace(' ', '_')}.json")
+            write_fleet_file(data_file, licenses)
+            manager = ScalixLicenseManager(data_file, storage_mode="journal", usage_event_dir=event_dir)
+            keys = [record["license_key"] for record in synthetic_license_records(licenses) if record["is_active"]]
+            for license_key in keys:
+                manager.validate_license(license_key)
+
+            latencies = []
+            for index in range(checks):
+                start = time.perf_counter()
+                manager.check_feature_access(keys[index % len(keys)], FeatureAccess.TURBO_EDITS)
+                latencies.append((time.perf_counter() - start) * 1e6)
+            # Checks against expired or deactivated licenses record no usage
+            events = manager.get_usage_totals(group_by=None)["totals"].get("total", 0)
+            result = {"mode": name, "events": events, **latency_summary(latencies)}
+            manager.close()
+
+            if event_dir:
+                result["disk_bytes_per_event"] = round(sum(
+                    os.path.getsize(path) for path in UsageEventSink.segment_paths(event_dir)) / events, 1)
+                start = time.perf_counter()
+                manager = ScalixLicenseManager(data_file, storage_mode="journal", usage_event_dir=event_dir)
+                result["replay_events_per_second"] = round(events / (time.perf_counter() - start))
+                result["replayed"] = manager.get_usage_totals(group_by=None)["totals"].get("total", 0)
+                manager.close()
+            results.append(result)
+
+    print(f"Feature checks: {checks:,} over {licenses:,} licenses (latencies in microseconds)")
+    print(f"{'mode':<12} {'p50 us':>8} {'p99 us':>8} {'max us':>10}")
+    for result in results:
+        print(f"{result['mode']:<12} {result['p50_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>10}")
+    logged = results[-1]
+    print(f"On disk (gzip): {logged['disk_bytes_per_event']} bytes/event; startup replay "
+          f"{logged['replay_events_per_second']:,} events/s ({logged['replayed']:,} of {logged['events']:,} "
+          f"events restored)")
+    return results
+
+def run_export(sizes=(10000, 100000)):
+    """
+    Peak memory and speed of streaming `/api/export/licenses` against
+    building the same NDJSON document in memory, at growing fleet sizes
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in sizes:
+            # Expiries are moved into the future so the startup expiry sweep has nothing to persist
+            # while the export is measured
+            data_file = os.path.join(workdir, f"fleet-{count}.json")
+            records = list(synthetic_license_records(count))
+            for index, record in enumerate(records):
+                record["expires_at"] = (datetime.now() + timedelta(days=1 + index % 365)).isoformat()
+            with open(data_file, "w") as f:
+                json.dump({"licenses": records, "device_id": "benchmark"}, f)
+            del records
+            manager = ScalixLicenseManager(data_file, storage_mode="journal")
+            client = ScalixLicenseDashboard(manager).app.test_client()
+            manager.get_license_analytics()  # Builds the expiry index outside the measurement
+
+            def streamed():
+                response = client.get("/api/export/licenses", buffered=False)
+                return sum(chunk.count(b"\n") for chunk in response.response)
+
+            def in_memory():
+                return len(("\n".join(json.dumps(license_obj.to_dict())
+                                       for license_obj in manager.licenses.values()) + "\n").splitlines())
+
+            for name, export in (("streamed", streamed), ("in memory", in_memory)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                rows = export()
+                seconds = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results.append({"licenses": count, "export": name, "rows": rows,
+                                "peak_mb": round(peak / 1024 / 1024, 2), "rows_per_second": round(rows / seconds)})
+            manager.close()
+
+    print(f"{'licenses':>9} {'export':<10} {'rows':>9} {'peak MB':>8} {'rows/s':>9}")
+    for result in results:
+        print(f"{result['licenses']:>9,} {result['export']:<10} {result['rows']:>9,} {result['peak_mb']:>8} "
+              f"{result['rows_per_second']:>9,}")
+    return results
+
+def run_search(sizes=(10000, 100000), pages: int = 50, limit: int = 50):
+    """
+    Latency of `/api/licenses` pages against filtering the whole fleet for
+    the same page, at growing fleet sizes
+    """
+    queries = (
+        ("tier by email", {"tier": LicenseTier.ENTERPRISE.value, "sort": "email"}),
+        ("inactive by key", {"status": "inactive"}),
+        ("expiring soon", {"expires_to": (datetime.now() + timedelta(days=30)).isoformat(), "sort": "expires_at"}),
+        ("one email", {"email": "user777@example.com"}),
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in sizes:
+            data_file = os.path.join(workdir, f"fleet-{count}.json")
+            records = list(synthetic_license_records(count))
+            for index, record in enumerate(records):
+                record["expires_at"] = (datetime.now() + timedelta(days=1 + index % 365)).isoformat()
+            with open(data_file, "w") as f:
+                json.dump({"licenses": records, "device_id": "benchmark"}, f)
+            del records
+            manager = ScalixLicenseManager(data_file, storage_mode="journal")
+            client = ScalixLicenseDashboard(manager).app.test_client()
+            manager.get_license_analytics()
+            start = time.perf_counter()
+            manager.search_licenses(limit=1)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            for name, query in queries:
+                query = dict(query, limit=limit)
+                latencies, rows, cursor = [], 0, None
+                for _ in range(pages):
+                    params = dict(query, cursor=cursor) if cursor else query
+                    start = time.perf_counter()
+                    response = client.get("/api/licenses", query_string=params)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    rows += response.json["count"]
+                    cursor = response.json["next_cursor"]
+                    if cursor is None:
+                        break
+
+                # Baseline: one page by filtering and sorting every license, without the indexes
+                start = time.perf_counter()
+                tier = query.get("tier")
+                matches = [license_obj for license_obj in manager.licenses.values()
+                           if (tier is None or license_obj.tier.value == tier)
+                           and (query.get("status") != "inactive" or not license_obj.is_active)
+                           and (query.get("email") is None or license_obj.email == query["email"])]
+                matches.sort(key=lambda license_obj: license_obj.email)
+                [license_obj.to_dict() for license_obj in matches[:limit]]
+                scan_ms = (time.perf_counter() - start) * 1000
+
+                summary = latency_summary(latencies)
+                results.append({"licenses": count, "query": name, "pages": len(latencies), "rows": rows,
+                                "index_build_ms": round(build_ms, 1), "page_p50_ms": summary["p50_ms"],
+                                "page_p99_ms": summary["p99_ms"], "full_scan_ms": round(scan_ms, 2)})
+            manager.close()
+
+    print(f"{'licenses':>9} {'query':<16} {'pages':>6} {'rows':>6} {'build ms':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'scan ms':>8}")
+    for result in results:
+        print(f"{result['licenses']:>9,} {result['query']:<16} {result['pages']:>6} {result['rows']:>6} "
+              f"{result['index_build_ms']:>9} {result['page_p50_ms']:>8} {result['page_p99_ms']:>8} "
+              f"{result['full_scan_ms']:>8}")
+    return results
+
+def run_provisioning(sizes=(1000, 10000, 100000), storage_modes=("json", "journal"), loop_limit: int = 1000):
+    """
+    Time provisioning seats with one admin_create_licenses_bulk() commit
+    against one admin_create_license() call per seat, on an empty store.
+    The per-seat loop is only run up to `loop_limit` seats: in JSON mode
+    every call rewrites the whole file, so it grows quadratically.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for storage_mode in storage_modes:
+            for count in sizes:
+                for method in ("bulk", "per seat"):
+                    if method == "per seat" and count > loop_limit:
+                        continue
+                    data_file = os.path.join(workdir, f"{storage_mode}-{count}-{method.replace(' ', '-')}.json")
+                    manager = ScalixLicenseManager(data_file, storage_mode=storage_mode)
+                    start = time.perf_counter()
+                    if method == "bulk":
+                        manager.admin_create_licenses_bulk(LicenseTier.ENTERPRISE, 365, count=count,
+                                                           email="buyer@example.com")
+                    else:
+                        for _ in range(count):
+                            manager.admin_create_license("buyer@example.com", LicenseTier.ENTERPRISE, 365)
+                    seconds = time.perf_counter() - start
+                    manager.close()
+                    results.append({"storage": storage_mode, "seats": count, "method": method,
+                                    "seconds": round(seconds, 3), "seats_per_second": round(count / seconds)})
+
+    print(f"{'storage':<8} {'seats':>8} {'method':<9} {'seconds':>9} {'seats/s':>10}")
+    for result in results:
+        print(f"{result['storage']:<8} {result['seats']:>8,} {result['method']:<9} {result['seconds']:>9} "
+              f"{result['seats_per_second']:>10,}")
+    return results
+
+def run_bulk_update(sizes=(10000, 100000), storage_modes=("journal", "json"), loop_limit: int = 200):
+    """
+    Time extending every enterprise license with one bulk_update_licenses()
+    call against renew_license() per key. The per-key loop only covers the
+    first `loop_limit` matches; its rate is what the whole set would see.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for storage_mode in storage_modes:
+            for count in sizes:
+                data_file = os.path.join(workdir, f"{storage_mode}-{count}.json")
+                records = list(synthetic_license_records(count))
+                for index, record in enumerate(records):
+                    record["expires_at"] = (datetime.now() + timedelta(days=1 + index % 365)).isoformat()
+                with open(data_file, "w") as f:
+                    json.dump({"licenses": records, "device_id": "benchmark"}, f)
+                del records
+                manager = ScalixLicenseManager(data_file, storage_mode=storage_mode)
+                manager.search_licenses(limit=1)  # Builds the indexes outside the measurement
+
+                start = time.perf_counter()
+                matched = manager.bulk_update_licenses("extend", tier=LicenseTier.ENTERPRISE.value, days=30,
+                                                       dry_run=True)["matched"]
+                dry_run_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                manager.bulk_update_licenses("extend", tier=LicenseTier.ENTERPRISE.value, days=30)
+                bulk_seconds = time.perf_counter() - start
+
+                page = manager.search_licenses(tier=LicenseTier.ENTERPRISE.value, limit=loop_limit)
+                license_keys = [license_obj["license_key"] for license_obj in page["licenses"]]
+                start = time.perf_counter()
+                for license_key in license_keys:
+                    manager.renew_license(license_key)
+                per_key_rate = len(license_keys) / (time.perf_counter() - start)
+                manager.close()
+
+                results.append({"storage": storage_mode, "licenses": count, "matched": matched,
+                                "dry_run_ms": round(dry_run_seconds * 1000, 1), "bulk_seconds": round(bulk_seconds, 3),
+                                "bulk_per_second": round(matched / bulk_seconds),
+                                "per_key_per_second": round(per_key_rate, 1)})
+
+    print(f"{'storage':<8} {'licenses':>9} {'matched':>8} {'dry run ms':>11} {'bulk s':>8} {'bulk/s':>9} "
+          f"{'per key/s':>10}")
+    for result in results:
+        print(f"{result['storage']:<8} {result['licenses']:>9,} {result['matched']:>8,} {result['dry_run_ms']:>11} "
+              f"{result['bulk_seconds']:>8} {result['bulk_per_second']:>9,} {result['per_key_per_second']:>10,}")
+    return results
+
+def run_retention(sizes=(10000, 1000000, 10000000), hours: int = 48):
+    """Time dropping the oldest hour of usage at several retained volumes"""
+    results = []
+    start_time = datetime.now() - timedelta(hours=hours)
+    for size in sizes:
+        log = FeatureUsageLog(EntitlementMatrix(), "benchmark")
+        per_hour = max(size // hours, 1)
+        batch = list(synthetic_usage_events(per_hour))
+        for hour in range(hours):
+            log.extend(batch, start_time + timedelta(hours=hour))
+
+        start = time.perf_counter()
+        removed = log.prune_before(start_time + timedelta(minutes=30))
+        seconds = time.perf_counter() - start
+        results.append({"events": per_hour * hours, "removed": removed, "prune_ms": round(seconds * 1000, 3)})
+        del log
+
+    print(f"Dropping one hour of usage out of {hours}")
+    print(f"{'events':>12} {'removed':>10} {'prune ms':>10}")
+    for result in results:
+        print(f"{result['events']:>12} {result['removed']:>10} {result['prune_ms']:>10}")
+    return results
+
+# ============================================================================
+# ANALYTICS: POPULATION COUNTERS
+# ============================================================================
+
+def run_analytics(count: int, mutations: int = 1000):
+    """Time analytics and check the incremental counters after a burst of mutations"""
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "licenses.json")
+        write_fleet_file(data_file, count)
+        manager = ScalixLicenseManager(data_file, storage_mode="journal", population_check=True)
+
+        start = time.perf_counter()
+        manager.get_license_analytics()
+        first_seconds = time.perf_counter() - start
+
+        # Creations, deactivations and renewals all move the counters
+        for i in range(mutations):
+            license_key = manager.admin_create_license(f"bench{i}@example.com", LicenseTier.PRO_YEARLY)["license_key"]
+            if i % 3 == 0:
+                manager.deactivate_license(license_key)
+            elif i % 3 == 1:
+                manager.renew_license(license_key)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            manager.population.snapshot()
+        counter_us = (time.perf_counter() - start) / 10 * 1e6
+        check = manager.verify_population_counters()
+        manager.close()
+
+    print(f"Analytics with {count} licenses and {mutations} mutations")
+    print(f"first analytics (builds counters): {first_seconds:.4f} s")
+    print(f"population counters read: {counter_us:.1f} us")
+    print(f"counters consistent with full scan: {check['consistent']} {check['mismatches'] or ''}")
+    return {"first_seconds": first_seconds, "counter_us": counter_us, **check}
+
+# ============================================================================
+# STRESS: CONCURRENT ACCESS
+# ============================================================================
+
+def run_stress(threads: int = 32, operations: int = 2000, licenses: int = 200, storage_mode: str = "journal"):
+    """
+    Hammer one manager from many threads and check that nothing was lost
+
+    Every thread validates, checks features and renews random licenses while
+    others create licenses and a saver thread snapshots continuously. At the
+    end usage counts, usage events, renewals and population counters must
+    match exactly what the threads did.
+    """
+    import random
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manager = ScalixLicenseManager(os.path.join(workdir, "licenses.json"), storage_mode=storage_mode,
+                                       validation_cache_ttl=0.001)
+        keys = [manager.admin_create_license(f"stress{i}@example.com", LicenseTier.PRO_MONTHLY)["license_key"]
+                for i in range(licenses)]
+        # Bind to this device up front so validations never take the transfer path
+        for license_key in keys:
+            manager.licenses[license_key].device_id = manager.device_id
+        initial_expiry = {license_key: manager.licenses[license_key].expires_at for license_key in keys}
+        initial_usage = {license_key: manager.licenses[license_key].usage_count for license_key in keys}
+
+        validations = [dict() for _ in range(threads)]
+        renewals = [dict() for _ in range(threads)]
+        created = [0] * threads
+        feature_uses = [0] * threads
+        errors = []
+        stop_saving = threading.Event()
+
+        def worker(index: int):
+            rng = random.Random(index)
+            try:
+                for i in range(operations):
+                    license_key = rng.choice(keys)
+                    roll = rng.random()
+                    if roll < 0.6:
+                        manager.validate_license(license_key)
+                    elif roll < 0.9:
+                        if manager.check_feature_access(license_key, FeatureAccess.TURBO_EDITS)["accessible"]:
+                            feature_uses[index] += 1
+                    elif roll < 0.97:
+                        manager.renew_license(license_key)
+                        renewals[index][license_key] = renewals[index].get(license_key, 0) + 1
+                        continue
+                    else:
+                        manager.admin_create_license(f"stress-{index}-{i}@example.com", LicenseTier.PRO_YEARLY)
+                        created[index] += 1
+                        continue
+                    validations[index][license_key] = validations[index].get(license_key, 0) + 1
+            except Exception as e:
+                errors.append(repr(e))
+
+        def saver():
+            while not stop_saving.is_set():
+                if not manager.save_data():
+                    errors.append("save_data failed")
+                manager.get_license_analytics()
+
+        saver_thread = threading.Thread(target=saver)
+        saver_thread.start()
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        seconds = time.perf_counter() - start
+        stop_saving.set()
+        saver_thread.join()
+        manager.flush_usage_counters()
+
+        mismatches = []
+        for license_key in keys:
+            expected_validations = sum(counts.get(license_key, 0) for counts in validations)
+            license_obj = manager.licenses[license_key]
+            if license_obj.usage_count - initial_usage[license_key] != expected_validations:
+                mismatches.append(f"{license_key}: usage_count off by "
+                                  f"{license_obj.usage_count - initial_usage[license_key] - expected_validations}")
+            expected_renewals = sum(counts.get(license_key, 0) for counts in renewals)
+            if license_obj.expires_at != initial_expiry[license_key] + timedelta(days=30 * expected_renewals):
+                mismatches.append(f"{license_key}: lost renewals")
+        if len(manager.usage_records) != sum(feature_uses):
+            mismatches.append(f"usage events {len(manager.usage_records)} != feature uses {sum(feature_uses)}")
+        rollup_total = manager.usage_rollups.totals(group_by=None).get("total", 0)
+        if rollup_total != sum(feature_uses):
+            mismatches.append(f"usage rollups {rollup_total} != feature uses {sum(feature_uses)}")
+        if len(manager.licenses) != licenses + sum(created):
+            mismatches.append(f"license count {len(manager.licenses)} != {licenses + sum(created)}")
+        population = manager.verify_population_counters()
+        if not population["consistent"]:
+            mismatches.append(f"population counters: {population['mismatches']}")
+        manager.close()
+
+    total_operations = threads * operations
+    print(f"Stress: {threads} threads x {operations} operations ({storage_mode})")
+    print(f"throughput: {total_operations / seconds:,.0f} ops/s")
+    print(f"errors: {len(errors)}  mismatches: {len(mismatches)}")
+    for problem in (errors + mismatches)[:10]:
+        print(f"  {problem}")
+    return {"ops_per_second": total_operations / seconds, "errors": errors, "mismatches": mismatches}
+
+# ============================================================================
+# SHARDED: THROUGHPUT VS WORKER COUNT
+# ============================================================================
+
+def _sharded_client(addresses, authkey, license_keys, seconds: float, batch_size: int, seed: int) -> int:
+    """Client process: validate random keys through its own router for `seconds`; returns validations"""
+    import random
+
+    rng = random.Random(seed)
+    router = ShardRouter(addresses, authkey)
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if batch_size > 1:
+            router.validate_many([rng.choice(license_keys) for _ in range(batch_size)])
+            done += batch_size
+        else:
+            router.validate_license(rng.choice(license_keys))
+            done += 1
+    router.close()
+    return done
+
+def run_sharded(worker_counts=(1, 2, 4), count: int = 20000, clients: int = 8, seconds: float = 5.0,
+                batch_size: int = 100):
+    """Validation throughput of the sharded service as the number of shard workers grows"""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "licenses.json")
+        write_fleet_file(data_file, count)
+        license_keys = [record["license_key"] for record in synthetic_license_records(count)
+                        if record["is_active"]][:5000]
+
+        context = multiprocessing.get_context("spawn")
+        for workers in worker_counts:
+            shard_dir = os.path.join(workdir, f"workers{workers}")
+            os.makedirs(shard_dir)
+            shard_file = os.path.join(shard_dir, "licenses.json")
+            os.link(data_file, shard_file)
+
+            with ShardedLicenseService(shard_file, shards=workers, storage_mode="journal") as service:
+                with context.Pool(clients) as pool:
+                    start = time.perf_counter()
+                    done = pool.starmap(_sharded_client, [
+                        (service.addresses, service.authkey, license_keys, seconds, batch_size, seed)
+                        for seed in range(clients)
+                    ])
+                    elapsed = time.perf_counter() - start
+                analytics = service.router().get_license_analytics()
+            results.append({
+                "workers": workers,
+                "validations": sum(done),
+                "validations_per_second": round(sum(done) / elapsed),
+                "licenses": analytics["license_metrics"]["total_licenses"],
+            })
+
+    print(f"Sharded validation: {count} licenses, {clients} client processes, batches of {batch_size}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'validations/s':>14} {'licenses':>10}")
+    for result in results:
+        print(f"{result['workers']:>8} {result['validations_per_second']:>14,} {result['licenses']:>10}")
+    return results
+
+# ============================================================================
+# SERVING: FLASK VS ASGI
+# ============================================================================
+
+def latency_summary(samples_ms) -> dict:
+    """p50/p90/p99/max of latency samples in milliseconds"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)], 3)
+
+    return {"count": len(ordered), "p50_ms": percentile(0.50), "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99), "max_ms": round(ordered[-1], 3)}
+
+def _slow_manager(workdir: str, name: str, count: int, write_delay: float) -> ScalixLicenseManager:
+    """Manager over a synthetic fleet whose store writes take at least `write_delay` seconds"""
+    data_file = os.path.join(workdir, f"{name}.json")
+    write_fleet_file(data_file, count)
+    manager = ScalixLicenseManager(data_file, storage_mode="journal")
+    put = manager.store.put
+
+    def slow_put(license_obj):
+        time.sleep(write_delay)
+        put(license_obj)
+
+    manager.store.put = slow_put
+    return manager
+
+def _serving_keys(manager: ScalixLicenseManager, count: int = 1000):
+    keys = [record["license_key"] for record in synthetic_license_records(count) if record["is_active"]]
+    # Bind to this device once so timed validations never take the transfer path
+    for license_key in keys:
+        manager.validate_license(license_key)
+    return keys
+
+def _run_flask_load(manager, keys, clients: int, seconds: float) -> dict:
+    """Threaded Flask clients validating while one thread keeps creating licenses"""
+    import random
+
+    app = ScalixLicenseDashboard(manager).app
+    latencies, writes = [], [0]
+    stop = threading.Event()
+
+    def reader(seed: int):
+        rng, client = random.Random(seed), app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get(f"/api/licenses/validate/{rng.choice(keys)}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    def writer():
+        client = app.test_client()
+        while not stop.is_set():
+            client.post("/api/admin/create-license", json={"email": "load@example.com", "tier": "pro_monthly"})
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(clients)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {"server": "flask", "validations_per_second": round(len(latencies) / seconds), "writes": writes[0],
+            **latency_summary(latencies)}
+
+async def _asgi_call(app, method: str, path: str, body: bytes = b""):
+    """Drive one request through an ASGI app in-process; returns the status code"""
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(), "headers": []}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+def _run_asgi_load(manager, keys, clients: int, seconds: float) -> dict:
+    """Concurrent ASGI clients validating while one task keeps creating licenses"""
+    import random
+
+    app = LicenseASGIApp(manager, read_workers=clients)
+    latencies, writes = [], [0]
+    create_body = json.dumps({"email": "load@example.com", "tier": "pro_monthly"}).encode()
+
+    async def reader(seed: int, deadline: float):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await _asgi_call(app, "GET", f"/api/licenses/validate/{rng.choice(keys)}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def writer(deadline: float):
+        while time.perf_counter() < deadline:
+            await _asgi_call(app, "POST", "/api/admin/create-license", create_body)
+            writes[0] += 1
+
+    async def run():
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(writer(deadline), *(reader(seed, deadline) for seed in range(clients)))
+
+    asyncio.run(run())
+    app.close()
+    return {"server": "asgi", "validations_per_second": round(len(latencies) / seconds), "writes": writes[0],
+            **latency_summary(latencies)}
+
+def run_serving(clients: int = 16, seconds: float = 5.0, write_delay_ms: float = 50.0, count: int = 10000):
+    """
+    Validation latency through the Flask app and the ASGI app, in-process
+
+    Both servers see the same load: `clients` concurrent validators plus one
+    client creating licenses against a store whose writes are slowed by
+    `write_delay_ms`. Requests are driven at the application boundary (Flask
+    test client, direct ASGI calls), so the numbers compare the serving
+    paths without a network stack or a particular ASGI server.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, run in (("flask", _run_flask_load), ("asgi", _run_asgi_load)):
+            manager = _slow_manager(workdir, name, count, write_delay_ms / 1000)
+            keys = _serving_keys(manager)
+            results.append(run(manager, keys, clients, seconds))
+            manager.close()
+
+    print(f"Serving: {clients} validating clients + 1 writer, store writes +{write_delay_ms} ms, {seconds}s each")
+    print(f"{'server':<8} {'valid/s':>9} {'writes':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for result in results:
+        print(f"{result['server']:<8} {result['validations_per_second']:>9,} {result['writes']:>7} "
+              f"{result['p50_ms']:>8} {result['p90_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8}")
+    return results
+
+# ============================================================================
+# ONLINE VALIDATION: PER-REQUEST CONNECTIONS VS POOLED CLIENT
+# ============================================================================
+
+def _online_lookups(count: int, distinct: int, seed: int = 7):
+    """(license_key, email) lookups where a few popular keys dominate, as during a launch"""
+    import random
+
+    rng = random.Random(seed)
+    keys = [f"SCALIX-PRO-{index:08d}" for index in range(distinct)]
+    return [(keys[min(int(rng.expovariate(10 / distinct)), distinct - 1)], "user@example.com")
+            for _ in range(count)]
+
+def _run_threads(clients: int, lookups, validate) -> float:
+    """Split lookups over `clients` threads calling validate(key, email); returns elapsed seconds"""
+    def worker(chunk):
+        for license_key, email in chunk:
+            validate(license_key, email)
+
+    threads = [threading.Thread(target=worker, args=(lookups[index::clients],)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+def run_online(clients: int = 32, count: int = 2000, distinct: int = 500, latency_ms: float = 20.0,
+               max_connections: int = 32):
+    """
+    Upstream validation through the local stand-in license server
+
+    Compares a new urllib connection per lookup, the pooled client (keep-alive
+    plus coalescing of identical lookups in flight) and one bulk
+    `validate_many()` call over the same lookups.
+    """
+    lookups = _online_lookups(count, distinct)
+    results = []
+    with LocalLicenseServer(latency=latency_ms / 1000) as server:
+        def urllib_validate(license_key, email):
+            body = json.dumps({"license_key": license_key, "email": email}).encode()
+            request = urllib.request.Request(server.url + LICENSE_SERVER_VALIDATE_PATH, data=body,
+                                             headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.load(response)
+
+        served, connections = server.requests, server.connections
+        elapsed = _run_threads(clients, lookups, urllib_validate)
+        results.append({"client": "urllib per request", "seconds": elapsed,
+                        "upstream_requests": server.requests - served,
+                        "connections": server.connections - connections})
+
+        for name, run in (("pooled + coalescing", lambda client: _run_threads(clients, lookups, client.validate)),
+                          ("bulk validate_many", lambda client: _timed(client.validate_many, lookups))):
+            client = LicenseServerClient(server.url, max_connections=max_connections, timeout=30)
+            served, connections = server.requests, server.connections
+            elapsed = run(client)
+            results.append({"client": name, "seconds": elapsed, "upstream_requests": server.requests - served,
+                            "connections": server.connections - connections})
+            client.close()
+
+    print(f"Online validation: {count:,} lookups over {distinct} keys, {clients} threads, "
+          f"upstream latency {latency_ms} ms, pool of {max_connections}")
+    print(f"{'client':<22} {'seconds':>8} {'lookups/s':>10} {'upstream':>9} {'conns':>6}")
+    for result in results:
+        print(f"{result['client']:<22} {result['seconds']:>8.2f} {count / result['seconds']:>10,.0f} "
+              f"{result['upstream_requests']:>9,} {result['connections']:>6}")
+    return results
+
+def _timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+# ============================================================================
+# RESILIENCE: SLOW UPSTREAM WITH AND WITHOUT THE VALIDATION LAYER
+# ============================================================================
+
+def _upstream_phase(validate, keys, cold_keys, clients: int, seconds: float, cold_ratio: float) -> dict:
+    """Run `clients` threads of lookups (mostly known keys, some never seen) and summarize latency"""
+    import random
+
+    latencies, errors, degraded = [], [0], [0]
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            license_key = rng.choice(cold_keys if rng.random() < cold_ratio else keys)
+            start = time.perf_counter()
+            try:
+                if validate(license_key, "user@example.com").get("degraded"):
+                    degraded[0] += 1
+            except LicenseServerError:
+                errors[0] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"errors": errors[0], "degraded": degraded[0], **latency_summary(latencies)}
+
+def run_resilience(clients: int = 16, seconds: float = 5.0, healthy_latency_ms: float = 10.0,
+                   slow_latency_ms: float = 2000.0, timeout: float = 0.25, keys: int = 200,
+                   cold_ratio: float = 0.05):
+    """
+    Client-facing upstream validation latency while the license server is healthy and then slow
+
+    "direct" calls the pooled client for every lookup; "layered" goes through
+    the manager's stale-while-revalidate cache and circuit breaker. Known keys
+    were validated once before the run; `cold_ratio` of lookups are for keys
+    never seen, which only the license server (or the offline fallback) can
+    answer. Answers go stale after one second, so the slow phase exercises
+    background refreshes rather than fresh cache hits.
+    """
+    known = [f"SCALIX-PRO-{index:06d}" for index in range(keys)]
+    cold_counter = iter(range(10 ** 9))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, LocalLicenseServer() as server:
+        manager = ScalixLicenseManager(os.path.join(workdir, "licenses.json"), offline_mode=False,
+                                       license_server_url=server.url, license_server_timeout=timeout,
+                                       license_server_connections=clients, license_server_fresh_ttl=1.0)
+        for license_key in known:
+            manager.online_validation.validate(license_key, "user@example.com")
+
+        for mode, validate in (("direct", manager.license_server.validate),
+                               ("layered", manager.online_validation.validate)):
+            for phase, latency_ms in (("healthy", healthy_latency_ms), ("slow", slow_latency_ms)):
+                server.latency = latency_ms / 1000
+                cold = [f"SCALIX-PRO-COLD-{next(cold_counter)}" for _ in range(1000)]
+                summary = _upstream_phase(validate, known, cold, clients, seconds, cold_ratio)
+                results.append({"mode": mode, "phase": phase, "upstream_latency_ms": latency_ms, **summary})
+        layer_stats = manager.online_validation.stats()
+        manager.close()
+
+    print(f"Upstream validation: {clients} threads, client timeout {timeout * 1000:.0f} ms, "
+          f"{cold_ratio:.0%} never-seen keys, {seconds}s per phase")
+    print(f"{'mode':<8} {'upstream':<16} {'lookups':>8} {'errors':>7} {'degraded':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for result in results:
+        upstream = f"{result['phase']} {result['upstream_latency_ms']:.0f} ms"
+        print(f"{result['mode']:<8} {upstream:<16} {result['count']:>8,} {result['errors']:>7,} "
+              f"{result['degraded']:>9,} {result['p50_ms']:>8} {result['p99_ms']:>8} {result['max_ms']:>8}")
+    print(f"Layer: {layer_stats}")
+    return results
+
+# ============================================================================
+# HOT PATH SUITE: REPRODUCIBLE MICRO-BENCHMARKS WITH A BASELINE
+# ============================================================================
+
+# Every run sees the same "now", so expiry-dependent answers do not drift between runs
+SUITE_EPOCH = datetime(2026, 1, 1, 12, 0, 0).timestamp()
+SUITE_TIER_MIX = ((LicenseTier.FREE, 0.40), (LicenseTier.PRO_MONTHLY, 0.35), (LicenseTier.PRO_YEARLY, 0.15),
+                  (LicenseTier.ENTERPRISE, 0.10))
+SUITE_OPERATIONS = ("load_data", "save_data", "sweep_expired_licenses", "validate_license", "check_feature_access",
+                    "_track_feature_usage", "get_license_analytics")
+
+def realistic_license_records(count: int, now: datetime, device_id: str, seed: int = 42):
+    """
+    Yield serialized licenses with a production-like mix, fixed by `seed`:
+    40/35/15/10% free/monthly/yearly/enterprise, about 10% already expired
+    (not yet marked by the sweeper), 5% expiring within a week, 2%
+    deactivated and 3% already transferred to another device; the rest are
+    bound to `device_id`
+    """
+    rng = random.Random(seed)
+    tiers, weights = zip(*SUITE_TIER_MIX)
+    features = [feature.value for feature in FeatureAccess]
+    for i in range(count):
+        tier = rng.choices(tiers, weights)[0]
+        roll = rng.random()
+        if roll < 0.10:
+            expires_at = now - timedelta(days=rng.uniform(0.01, 90))
+        elif roll < 0.15:
+            expires_at = now + timedelta(days=rng.uniform(0.01, 7))
+        else:
+            expires_at = now + timedelta(days=rng.uniform(7, 365 if tier == LicenseTier.PRO_YEARLY else 31))
+        activated_at = expires_at - timedelta(days=365 if tier == LicenseTier.PRO_YEARLY else 30)
+        metadata = {}
+        bound = rng.random() >= 0.03
+        if not bound:
+            metadata["device_transferred"] = True
+        yield {
+            "license_key": f"SCALIX-{tier.value.upper()}-{i:016X}",
+            "tier": tier.value,
+            "email": f"user{i}@customer{i % 997}.example.com",
+            "device_id": device_id if bound else f"{rng.getrandbits(64):016x}",
+            "activated_at": activated_at.isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "last_validated": (now - timedelta(hours=rng.uniform(0, 72))).isoformat(),
+            "is_active": rng.random() >= 0.02,
+            "usage_count": rng.randint(0, 5000),
+            "features_used": rng.sample(features, rng.randint(0, 3)) if tier != LicenseTier.FREE else [],
+            "metadata": metadata,
+        }
+
+def _suite_percentiles(samples_ns) -> dict:
+    ordered = sorted(samples_ns)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)] / 1000, 2)
+
+    return {"p50_us": percentile(0.50), "p90_us": percentile(0.90), "p99_us": percentile(0.99),
+            "max_us": round(ordered[-1] / 1000, 2)}
+
+def _suite_measure(operation, args_list, memory_ops: int, warmup: bool = True, rounds: int = 1) -> dict:
+    """
+    Run `operation(*args)` once per entry of `args_list` for latency and
+    throughput, keeping the fastest of `rounds` passes (as timeit does) to
+    damp scheduler noise, then the first `memory_ops` entries again under
+    tracemalloc for the peak memory one call allocates. The warm-up call
+    keeps one-time index and counter builds out of the steady-state figures.
+    """
+    if warmup:
+        operation(*args_list[0])
+    perf_counter_ns = time.perf_counter_ns
+    elapsed, samples = None, None
+    for _ in range(rounds):
+        round_samples = []
+        start = perf_counter_ns()
+        for args in args_list:
+            op_start = perf_counter_ns()
+            operation(*args)
+            round_samples.append(perf_counter_ns() - op_start)
+        round_elapsed = (perf_counter_ns() - start) / 1e9
+        if elapsed is None or round_elapsed < elapsed:
+            elapsed, samples = round_elapsed, round_samples
+
+    peak = 0
+    tracemalloc.start()
+    for args in args_list[:memory_ops]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation(*args)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {"ops": len(args_list), "ops_per_second": round(len(args_list) / elapsed, 3),
+            **_suite_percentiles(samples), "peak_memory_kb": round(peak / 1024, 1)}
+
+def _suite_first_sweep(source_file: str, workdir: str, storage_mode: str, rounds: int) -> tuple:
+    """
+    Time the first cleanup pass of a manager opened on a fresh copy of
+    `source_file` (expiry index build plus marking every already expired
+    license), once per round. The pass runs on the manager's cleanup
+    thread, so its duration is read from the cleanup histogram. Returns
+    (timings, data file of the last round, which is left swept).
+    """
+    samples = []
+    for round_number in range(rounds):
+        round_dir = os.path.join(workdir, f"sweep-{round_number}")
+        os.makedirs(round_dir)
+        data_file = os.path.join(round_dir, os.path.basename(source_file))
+        shutil.copyfile(source_file, data_file)
+        manager = ScalixLicenseManager(data_file, storage_mode=storage_mode, clock=lambda: SUITE_EPOCH)
+        first_pass = manager._cleanup_seconds.labels()
+        while not sum(first_pass.counts):
+            time.sleep(0.01)
+        samples.append(int(first_pass.sum * 1e9))
+        manager.close()
+        if round_number < rounds - 1:
+            shutil.rmtree(round_dir)
+    return ({"ops": rounds, "ops_per_second": round(1e9 / min(samples), 3), **_suite_percentiles(samples),
+             "peak_memory_kb": None}, data_file)
+
+def run_suite(sizes=(1000, 100000, 1000000), operations: int = 20000, analytics_operations: int = 20,
+              persistence_operations: int = 3, rounds: int = 5, storage_mode: str = "json", seed: int = 42) -> dict:
+    """
+    Time the license hot paths against synthetic fleets of each size
+
+    The manager runs on a frozen clock at SUITE_EPOCH and every fleet,
+    key sequence and feature sequence comes from `seed`, so two runs do
+    the same work and get the same answers. Per operation it reports
+    ops/s, latency percentiles and the peak memory of a single call; hot
+    path figures are the best of `rounds` passes. Fleets are written
+    unswept, so the first sweep pays for every already expired license;
+    the other operations then run on the swept fleet.
+    """
+    now = datetime.fromtimestamp(SUITE_EPOCH)
+    features = [feature.value for feature in FeatureAccess]
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # Licenses are bound to this machine, as on a deployed manager; others would transfer on first use
+        probe = ScalixLicenseManager(os.path.join(workdir, "probe.json"), storage_mode=storage_mode)
+        device_id = probe.device_id
+        probe.close()
+        for count in sizes:
+            source_file = os.path.join(workdir, f"suite-{count}.json")
+            records = list(realistic_license_records(count, now, device_id, seed))
+            with open(source_file, "w") as f:
+                json.dump({"licenses": records, "device_id": "benchmark"}, f)
+            del records
+            sweep, data_file = _suite_first_sweep(source_file, os.path.join(workdir, f"fleet-{count}"),
+                                                  storage_mode, persistence_operations)
+
+            def load():
+                # load_data() is the store's load, which runs when a manager opens the file
+                loaded = ScalixLicenseManager(data_file, storage_mode=storage_mode, clock=lambda: SUITE_EPOCH)
+                loaded.close()
+
+            timings = {"load_data": _suite_measure(load, [()] * persistence_operations, 1, warmup=False),
+                       "sweep_expired_licenses": sweep}
+            manager = ScalixLicenseManager(data_file, storage_mode=storage_mode, clock=lambda: SUITE_EPOCH)
+            manager.sweep_expired_licenses()  # The fleet is already swept; this only empties the queue
+
+            rng = random.Random(seed)
+            fleet_keys = sorted(manager.licenses)
+            license_keys = [rng.choice(fleet_keys) for _ in range(operations)]
+            checks = [(license_key, rng.choice(features)) for license_key in license_keys]
+
+            timings["validate_license"] = _suite_measure(
+                manager.validate_license, [(license_key,) for license_key in license_keys], 100, rounds=rounds)
+            timings["check_feature_access"] = _suite_measure(manager.check_feature_access, checks, 100,
+                                                             rounds=rounds)
+            timings["_track_feature_usage"] = _suite_measure(manager._track_feature_usage, checks, 100,
+                                                             rounds=rounds)
+            timings["get_license_analytics"] = _suite_measure(
+                manager.get_license_analytics, [()] * analytics_operations, 1, rounds=rounds)
+            timings["save_data"] = _suite_measure(manager.save_data, [()] * persistence_operations, 1, warmup=False)
+            manager.close()
+
+            for operation in SUITE_OPERATIONS:
+                results.append({"licenses": count, "operation": operation, **timings[operation]})
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "clock": datetime.fromtimestamp(SUITE_EPOCH).isoformat(),
+            "seed": seed,
+            "rounds": rounds,
+            "storage_mode": storage_mode,
+        },
+        "results": results,
+    }
+    print(f"{'licenses':>9} {'operation':<22} {'ops':>6} {'ops/s':>11} {'p50 us':>9} {'p99 us':>10} "
+          f"{'peak KB':>9}")
+    for result in results:
+        print(f"{result['licenses']:>9,} {result['operation']:<22} {result['ops']:>6} "
+              f"{result['ops_per_second']:>11,} {result['p50_us']:>9} {result['p99_us']:>10} "
+              f"{result['peak_memory_kb'] if result['peak_memory_kb'] is not None else '-':>9}")
+    return report
+
+class _NullMetric:
+    """Stands in for a counter child or histogram when timing the uninstrumented paths"""
+
+    def tick(self):
+        pass
+
+    def observe(self, *args):
+        pass
+
+def _ns_per_call(operation, calls: int = 1000000) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        operation()
+    return (time.perf_counter_ns() - start) / calls
+
+def run_metrics(count: int = 10000, operations: int = 50000, rounds: int = 7, seed: int = 42) -> List[dict]:
+    """
+    Cost of the /metrics instrumentation on the validation hot path
+
+    Each path is timed with the manager's and API's metrics live and
+    with them swapped for no-op stand-ins, alternating which goes first
+    each round and keeping the best round of each, with the garbage
+    collector paused as in timeit; the API path goes through the Flask
+    test client. Differences of under ~100 ns per call are below the
+    noise of such a comparison, so each path also gets a bound: the
+    measured price of its counter ticks and histogram observations as a
+    share of the uninstrumented call.
+    """
+    counter = Counter("benchmark_total", "").labels()
+    histogram = Histogram("benchmark_seconds", "").labels()
+    tick_ns = _ns_per_call(counter.tick)
+    observe_ns = _ns_per_call(lambda: histogram.observe(0.0004))
+
+    now = datetime.fromtimestamp(SUITE_EPOCH)
+    features = [feature.value for feature in FeatureAccess]
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "metrics.json")
+        probe = ScalixLicenseManager(os.path.join(workdir, "probe.json"), storage_mode="journal")
+        device_id = probe.device_id
+        probe.close()
+        with open(data_file, "w") as f:
+            json.dump({"licenses": list(realistic_license_records(count, now, device_id, seed)),
+                       "device_id": "benchmark"}, f)
+        manager = ScalixLicenseManager(data_file, storage_mode="journal", clock=lambda: SUITE_EPOCH)
+        manager.sweep_expired_licenses()
+        dashboard = ScalixLicenseDashboard(manager)
+        api, client = dashboard.api, dashboard.app.test_client()
+
+        rng = random.Random(seed)
+        fleet_keys = sorted(manager.licenses)
+        license_keys = [rng.choice(fleet_keys) for _ in range(operations)]
+        checks = [(license_key, rng.choice(features)) for license_key in license_keys]
+        urls = [(f"/api/licenses/validate/{license_key}",) for license_key in license_keys[:operations // 10]]
+        # (name, operation, arguments, metric cost per call)
+        paths = [("validate_license", manager.validate_license, [(key,) for key in license_keys], tick_ns),
+                 ("check_feature_access", manager.check_feature_access, checks, tick_ns),
+                 ("GET validate (Flask)", client.get, urls, tick_ns + observe_ns)]
+
+        variants = [("instrumented", (manager._validation_outcomes, api._request_seconds)),
+                    ("bare", ({outcome: _NullMetric() for outcome in manager._validation_outcomes}, _NullMetric()))]
+        results = []
+        for name, operation, args_list, metric_ns in paths:
+            best = {}
+            for args in args_list:  # Warm the validation cache and indexes
+                operation(*args)
+            gc.disable()
+            for round_number in range(rounds):
+                for variant, (outcomes, request_seconds) in variants[::-1] if round_number % 2 else variants:
+                    manager._validation_outcomes, api._request_seconds = outcomes, request_seconds
+                    start = time.perf_counter()
+                    for args in args_list:
+                        operation(*args)
+                    best[variant] = min(best.get(variant, float("inf")), time.perf_counter() - start)
+            gc.enable()
+            manager._validation_outcomes, api._request_seconds = variants[0][1]
+            bare_ns = best["bare"] / len(args_list) * 1e9
+            results.append({
+                "path": name,
+                "bare_ops_per_second": round(len(args_list) / best["bare"]),
+                "instrumented_ops_per_second": round(len(args_list) / best["instrumented"]),
+                "measured_overhead_percent": round((best["instrumented"] / best["bare"] - 1) * 100, 2),
+                "bound_overhead_percent": round(metric_ns / bare_ns * 100, 2),
+            })
+        scrape_ms = _ns_per_call(manager.metrics.render, 100) / 1e6
+        manager.close()
+
+    print(f"Metrics overhead on {count:,} licenses (best of {rounds} rounds)")
+    print(f"{'path':<22} {'bare ops/s':>11} {'instrumented':>13} {'measured':>9} {'bound':>7}")
+    for result in results:
+        print(f"{result['path']:<22} {result['bare_ops_per_second']:>11,} "
+              f"{result['instrumented_ops_per_second']:>13,} {result['measured_overhead_percent']:>8}% "
+              f"{result['bound_overhead_percent']:>6}%")
+    print(f"Per call: counter tick {tick_ns:.0f} ns, histogram observation {observe_ns:.0f} ns; "
+          f"one /metrics scrape {scrape_ms:.2f} ms")
+    return results
+
+def compare_suite(report: dict, baseline: dict, threshold: float = 0.15) -> List[dict]:
+    """
+    Regressions of `report` against `baseline`: ops/s down, or p99 latency
+    or peak memory up, by more than `threshold` for the same fleet size
+    and operation. Operations missing from the baseline are skipped.
+    """
+    previous = {(result["licenses"], result["operation"]): result for result in baseline["results"]}
+    checks = (("ops_per_second", -1), ("p99_us", 1), ("peak_memory_kb", 1))
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["licenses"], result["operation"]))
+        if before is None:
+            continue
+        for metric, direction in checks:
+            if not before[metric]:
+                continue
+            change = (result[metric] - before[metric]) / before[metric]
+            if change * direction > threshold:
+                regressions.append({"licenses": result["licenses"], "operation": result["operation"],
+                                    "metric": metric, "baseline": before[metric], "current": result[metric],
+                                    "change_percent": round(change * 100, 1)})
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%} against the baseline:")
+        for regression in regressions:
+            print(f"  {regression['licenses']:>9,} {regression['operation']:<22} {regression['metric']:<15} "
+                  f"{regression['baseline']} -> {regression['current']} ({regression['change_percent']:+}%)")
+    else:
+        print(f"\nNo regressions beyond {threshold:.0%} against the baseline")
+    return regressions
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Scalix license manager benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    startup_parser = subparsers.add_parser("startup", help="Compare eager and lazy license loading")
+    startup_parser.add_argument("--licenses", type=int, default=100000)
+
+    usage_parser = subparsers.add_parser("usage", help="Compare usage event storage footprints")
+    usage_parser.add_argument("--events", type=int, default=1000000)
+
+    analytics_parser = subparsers.add_parser("analytics", help="Time analytics and verify population counters")
+    analytics_parser.add_argument("--licenses", type=int, default=100000)
+
+    subparsers.add_parser("retention", help="Time usage retention at increasing retained volumes")
+
+    stress_parser = subparsers.add_parser("stress", help="Concurrent access stress test with exact final counts")
+    stress_parser.add_argument("--threads", type=int, default=32)
+    stress_parser.add_argument("--operations", type=int, default=2000)
+    stress_parser.add_argument("--storage-mode", default="journal")
+
+    sharded_parser = subparsers.add_parser("sharded", help="Throughput of the sharded service by worker count")
+    sharded_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    sharded_parser.add_argument("--licenses", type=int, default=20000)
+    sharded_parser.add_argument("--clients", type=int, default=8)
+    sharded_parser.add_argument("--seconds", type=float, default=5.0)
+    sharded_parser.add_argument("--batch-size", type=int, default=100)
+
+    serving_parser = subparsers.add_parser("serving", help="Validation latency through Flask vs ASGI")
+    serving_parser.add_argument("--clients", type=int, default=16)
+    serving_parser.add_argument("--seconds", type=float, default=5.0)
+    serving_parser.add_argument("--write-delay-ms", type=float, default=50.0)
+
+    online_parser = subparsers.add_parser("online", help="Upstream validation: per-request vs pooled client")
+    online_parser.add_argument("--clients", type=int, default=32)
+    online_parser.add_argument("--lookups", type=int, default=2000)
+    online_parser.add_argument("--latency-ms", type=float, default=20.0)
+    online_parser.add_argument("--connections", type=int, default=32)
+
+    resilience_parser = subparsers.add_parser("resilience", help="Validation latency with a slow license server")
+    resilience_parser.add_argument("--clients", type=int, default=16)
+    resilience_parser.add_argument("--seconds", type=float, default=5.0)
+    resilience_parser.add_argument("--slow-latency-ms", type=float, default=2000.0)
+    resilience_parser.add_argument("--timeout", type=float, default=0.25)
+
+    event_log_parser = subparsers.add_parser("event-log", help="Feature check cost of the durable usage log")
+    event_log_parser.add_argument("--checks", type=int, default=200000)
+
+    export_parser = subparsers.add_parser("export", help="Memory of streaming license exports by fleet size")
+    export_parser.add_argument("--licenses", type=int, nargs="+", default=[10000, 100000])
+
+    search_parser = subparsers.add_parser("search", help="Latency of indexed license search pages by fleet size")
+    search_parser.add_argument("--licenses", type=int, nargs="+", default=[10000, 100000])
+
+    provisioning_parser = subparsers.add_parser("provisioning", help="Bulk license creation against one call per seat")
+    provisioning_parser.add_argument("--seats", type=int, nargs="+", default=[1000, 10000, 100000])
+    provisioning_parser.add_argument("--storage", nargs="+", default=["json", "journal"])
+    provisioning_parser.add_argument("--loop-limit", type=int, default=1000)
+
+    bulk_update_parser = subparsers.add_parser("bulk-update", help="Bulk mutation by filter against one call per key")
+    bulk_update_parser.add_argument("--licenses", type=int, nargs="+", default=[10000, 100000])
+    bulk_update_parser.add_argument("--storage", nargs="+", default=["journal", "json"])
+    bulk_update_parser.add_argument("--loop-limit", type=int, default=200)
+
+    suite_parser = subparsers.add_parser("suite", help="Reproducible hot path timings, compared to a saved baseline")
+    suite_parser.add_argument("--licenses", type=int, nargs="+", default=[1000, 100000, 1000000])
+    suite_parser.add_argument("--operations", type=int, default=20000)
+    suite_parser.add_argument("--storage-mode", default="json")
+    suite_parser.add_argument("--rounds", type=int, default=5)
+    suite_parser.add_argument("--seed", type=int, default=42)
+    suite_parser.add_argument("--output", help="Write the results as JSON to this file")
+    suite_parser.add_argument("--baseline", help="Results JSON of an earlier run; exit 1 on regressions")
+    suite_parser.add_argument("--threshold", type=float, default=0.15)
+
+    metrics_parser = subparsers.add_parser("metrics", help="Validation throughput with and without metrics")
+    metrics_parser.add_argument("--licenses", type=int, default=10000)
+    metrics_parser.add_argument("--operations", type=int, default=50000)
+    metrics_parser.add_argument("--rounds", type=int, default=7)
+
+    probe_parser = subparsers.add_parser("_probe-startup")
+    probe_parser.add_argument("data_file")
+    probe_parser.add_argument("--lazy", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        run_startup(args.licenses)
+    elif args.command == "usage":
+        run_usage(args.events)
+    elif args.command == "stress":
+        result = run_stress(args.threads, args.operations, storage_mode=args.storage_mode)
+        sys.exit(1 if result["errors"] or result["mismatches"] else 0)
+    elif args.command == "sharded":
+        run_sharded(args.workers, args.licenses, args.clients, args.seconds, args.batch_size)
+    elif args.command == "serving":
+        run_serving(args.clients, args.seconds, args.write_delay_ms)
+    elif args.command == "online":
+        run_online(args.clients, args.lookups, latency_ms=args.latency_ms, max_connections=args.connections)
+    elif args.command == "resilience":
+        run_resilience(args.clients, args.seconds, slow_latency_ms=args.slow_latency_ms, timeout=args.timeout)
+    elif args.command == "event-log":
+        run_event_log(args.checks)
+    elif args.command == "export":
+        run_export(args.licenses)
+    elif args.command == "search":
+        run_search(args.licenses)
+    elif args.command == "provisioning":
+        run_provisioning(args.seats, args.storage, args.loop_limit)
+    elif args.command == "bulk-update":
+        run_bulk_update(args.licenses, args.storage, args.loop_limit)
+    elif args.command == "suite":
+        report = run_suite(args.licenses, args.operations, rounds=args.rounds, storage_mode=args.storage_mode,
+                           seed=args.seed)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            sys.exit(1 if compare_suite(report, baseline, args.threshold) else 0)
+    elif args.command == "metrics":
+        run_metrics(args.licenses, args.operations, args.rounds)
+    elif args.command == "retention":
+        run_retention()
+    elif args.command == "analytics":
+        run_analytics(args.licenses)
+    elif args.command == "_probe-startup":
+        print(json.dumps(probe_startup(args.data_file, args.lazy)))
+
+
+if __name__ == "__main__":
+    main()
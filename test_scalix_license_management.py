@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the Scalix license manager
+
+Run with `python -m pytest test_scalix_license_management.py`.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from scalix_license_benchmark import run_stress
+from scalix_license_management import (ApiRequest, BinaryLicenseSnapshot, CircuitBreaker, Counter, ExpiryIndex,
+                                        JournaledLicenseStore, LazyLicenseMap, LicenseAPI, LicenseKey,
+                                        LicenseSearchIndex, LicenseServerClient, LicenseServerError, LicenseTier,
+                                        MappedSnapshotLicenseStore, OnlineValidationLayer, ScalixLicenseManager)
+
+
+def _license(license_key: str, **fields) -> LicenseKey:
+    now = datetime.now().replace(microsecond=0)
+    values = dict(license_key=license_key, tier=LicenseTier.PRO_MONTHLY, email=f"{license_key.lower()}@example.com",
+                  device_id="device", activated_at=now, expires_at=now + timedelta(days=30), last_validated=now,
+                  is_active=True, usage_count=0, features_used=[], metadata={})
+    values.update(fields)
+    return LicenseKey(**values)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    license_manager = ScalixLicenseManager(str(tmp_path / "licenses.json"), storage_mode="journal")
+    yield license_manager
+    license_manager.close()
+
+
+def test_bulk_update_builds_indexes_on_a_fresh_manager(manager, tmp_path):
+    for i in range(3):
+        manager.admin_create_license(f"user{i}@example.com", LicenseTier.PRO_MONTHLY, 30)
+    manager.close()
+
+    # A reopened manager builds its search index on first use
+    reopened = ScalixLicenseManager(str(tmp_path / "licenses.json"), storage_mode="journal")
+    try:
+        assert not reopened.search_index.built
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.update(reopened.bulk_update_licenses("deactivate", email_domain="example.com")),
+            daemon=True)
+        worker.start()
+        worker.join(10)
+        assert not worker.is_alive(), "bulk update deadlocked"
+        assert result["updated"] == 3
+        assert all(not license_obj.is_active for license_obj in reopened.licenses.values())
+    finally:
+        reopened.close()
+
+
+def _rebuild_racing_update(index, entries, update):
+    """Rebuild `index` from `entries` while `update` runs on another thread midway through the scan"""
+    worker = threading.Thread(target=update, daemon=True)
+
+    def scan():
+        yield entries[0]
+        worker.start()
+        worker.join(0.2)  # Lands during the build unless the index lock keeps it out
+        yield from entries[1:]
+
+    index.rebuild(scan())
+    worker.join(10)
+    assert not worker.is_alive()
+
+
+def test_expiry_index_keeps_an_update_that_races_its_first_build():
+    index = ExpiryIndex()
+    expires_at = datetime(2026, 1, 1)
+    _rebuild_racing_update(index, [("A", expires_at.isoformat(), True), ("B", expires_at.isoformat(), True)],
+                           lambda: index.update("C", expires_at, True))
+    assert index.get("C") == (expires_at.timestamp(), True)
+
+
+def test_search_index_keeps_an_update_that_races_its_first_build():
+    index = LicenseSearchIndex()
+    _rebuild_racing_update(index, [("A", "a@example.com", "free", True), ("B", "b@example.com", "free", True)],
+                           lambda: index.update("C", "C@Example.com", "free", False))
+    assert index.get("C") == ("c@example.com", "free", False)
+    assert list(index.scan("inactive")) == ["C"]
+
+
+def test_lazy_map_iteration_keeps_records_hydrated_midway():
+    license_map = LazyLicenseMap()
+    for license_obj in (_license("A"), _license("B")):
+        license_map.put_raw(license_obj.to_dict())
+    license_map["A"]
+
+    records = license_map.iter_serialized()
+    first = next(records)
+    license_map["B"]  # Hydrated after the hydrated records were listed
+    assert sorted([first["license_key"]] + [record["license_key"] for record in records]) == ["A", "B"]
+
+
+def test_revocation_only_rejects_tokens_issued_before_it(tmp_path):
+    now = [datetime(2026, 1, 1).timestamp()]
+    manager = ScalixLicenseManager(str(tmp_path / "licenses.json"), storage_mode="journal", clock=lambda: now[0])
+    try:
+        old_token = manager.activate_license("SCALIX-PRO-DEMO-2025", "demo@scalix.world", True)["token"]
+        now[0] += 5
+        manager.deactivate_license("SCALIX-PRO-DEMO-2025")
+        now[0] += 5
+        new_token = manager.activate_license("SCALIX-PRO-DEMO-2025", "demo@scalix.world", True)["token"]
+
+        assert not manager.verify_license_token(old_token).is_valid
+        assert manager.verify_license_token(new_token).is_valid
+    finally:
+        manager.close()
+
+
+def test_expiring_licenses_endpoint_uses_the_manager_clock(tmp_path):
+    now = datetime(2030, 6, 1)
+    manager = ScalixLicenseManager(str(tmp_path / "licenses.json"), storage_mode="journal",
+                                   clock=lambda: now.timestamp())
+    try:
+        license_key = manager.admin_create_license("user@example.com", LicenseTier.PRO_MONTHLY, 3)["license_key"]
+        payload, status = LicenseAPI(manager).dispatch("expiring_licenses", ApiRequest({}, {"within_days": "7"}))
+        assert status == 200
+        assert payload["start"] == now.isoformat()
+        assert [entry["license_key"] for entry in payload["licenses"]] == [license_key]
+    finally:
+        manager.close()
+
+
+def test_validation_racing_a_deactivation_is_not_cached(manager):
+    license_key = manager.admin_create_license("user@example.com", LicenseTier.PRO_MONTHLY, 30)["license_key"]
+    validate_uncached = manager._validate_license_uncached
+
+    def deactivated_meanwhile(key, now):
+        validation = validate_uncached(key, now)
+        manager.deactivate_license(key)  # Lands between the computation and the cache fill
+        return validation
+
+    manager._validate_license_uncached = deactivated_meanwhile
+    assert manager.validate_license(license_key).is_valid
+    manager._validate_license_uncached = validate_uncached
+
+    assert not manager.validate_license(license_key).is_valid
+    assert not manager.check_feature_access(license_key, "turbo_edits")["accessible"]
+
+
+def test_sweep_commits_all_expired_licenses_at_once(manager):
+    keys = [manager.admin_create_license(f"user{i}@example.com", LicenseTier.PRO_MONTHLY, 30)["license_key"]
+            for i in range(3)]
+    commits = []
+    put, put_many = manager.store.put, manager.store.put_many
+    manager.store.put = lambda license_obj: commits.append([license_obj]) or put(license_obj)
+    manager.store.put_many = lambda license_objs: commits.append(list(license_objs)) or put_many(license_objs)
+
+    swept = manager.sweep_expired_licenses(datetime.now() + timedelta(days=31))
+    assert set(keys) <= set(swept)
+    assert len(commits) == 1 and len(commits[0]) == len(swept)
+    assert all("expired_at" in manager.licenses[key].metadata for key in keys)
+
+
+def test_usage_rollups_restart_from_the_close_checkpoint(tmp_path):
+    def open_manager():
+        return ScalixLicenseManager(str(tmp_path / "licenses.json"), storage_mode="journal",
+                                    usage_event_dir=str(tmp_path / "usage"))
+
+    manager = open_manager()
+    for _ in range(3):
+        manager._track_feature_usage("SCALIX-PRO-DEMO-2025", "turbo_edits")
+    totals = manager.get_usage_totals()["totals"]
+    manager.close()
+
+    reopened = open_manager()
+    try:
+        assert reopened.get_usage_totals()["totals"] == totals == {"turbo_edits": 3}
+        assert len(reopened.usage_records) == 3
+        reopened._track_feature_usage("SCALIX-PRO-DEMO-2025", "turbo_edits")
+    finally:
+        reopened.close()
+
+    # Events before the checkpoint are counted from it, not replayed
+    assert (tmp_path / "usage" / ScalixLicenseManager.USAGE_CHECKPOINT).exists()
+    segments = sorted((tmp_path / "usage").glob("usage-*"))
+    segments[0].unlink()
+    restarted = open_manager()
+    try:
+        assert restarted.get_usage_totals()["totals"] == {"turbo_edits": 4}
+    finally:
+        restarted.close()
+
+
+def test_counter_ticks_from_every_thread_are_counted():
+    counter = Counter("scalix_test_total", "Test ticks", ("outcome",))
+    child = counter.labels("valid")
+
+    def tick_many():
+        for _ in range(1000):
+            child.tick()
+
+    workers = [threading.Thread(target=tick_many) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    tick_many()
+    child.inc(amount=5)
+
+    assert child.value == 9005
+    assert counter.expose() == ['scalix_test_total{outcome="valid"} 9005']
+
+
+@pytest.fixture
+def server_client():
+    client = LicenseServerClient("http://127.0.0.1:9", max_connections=1, timeout=0.2)
+    yield client
+    client.close()
+
+
+def test_short_batch_response_is_a_server_error(server_client):
+    async def short_batch(method, path, payload):
+        return {"results": [{"valid": True}]}
+
+    server_client._request = short_batch
+    with pytest.raises(LicenseServerError):
+        server_client.validate_many([("KEY-1", "a@example.com"), ("KEY-2", "b@example.com")])
+
+
+def test_malformed_response_body_is_a_server_error(server_client):
+    class Writer:
+        def close(self):
+            pass
+
+    async def connect():
+        return None, Writer()
+
+    async def exchange(connection, method, path, body):
+        return 200, b"<html>Bad gateway</html>", False
+
+    server_client._connect, server_client._exchange = connect, exchange
+    with pytest.raises(LicenseServerError):
+        server_client.validate("KEY-1", "a@example.com")
+
+
+def test_saturated_pool_times_out(server_client):
+    server_client._run(server_client._slots.acquire())  # Every connection slot is busy
+    started = time.monotonic()
+    with pytest.raises(LicenseServerError):
+        server_client.validate("KEY-1", "a@example.com")
+    assert time.monotonic() - started < 1
+
+
+def test_half_open_probe_failing_with_a_non_server_error_releases_the_breaker():
+    now = [0.0]
+    failures = [LicenseServerError("down"), ValueError("malformed answer")]
+
+    def fetch(license_key, email):
+        if failures:
+            raise failures.pop(0)
+        return {"valid": True}
+
+    layer = OnlineValidationLayer(fetch, lambda license_key, email: {"valid": False}, fresh_ttl=0, grace=0,
+                                  breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0]),
+                                  clock=lambda: now[0])
+    try:
+        assert layer.validate("KEY-1", "a@example.com")["source"] == "offline"
+        now[0] += 11
+        probe = layer.validate("KEY-1", "a@example.com")  # Degrades instead of raising
+        assert (probe["source"], probe["degraded"]) == ("offline", True)
+        now[0] += 11
+        assert layer.validate("KEY-1", "a@example.com")["source"] == "upstream"
+        assert layer.breaker.state == CircuitBreaker.CLOSED
+    finally:
+        layer.close()
+
+
+def test_population_counters_match_a_full_scan_after_mixed_mutations(manager):
+    manager.get_license_analytics()  # Builds the counters, so every mutation below moves them
+    keys = [manager.admin_create_license(f"user{i}@example.com", tier, 30)["license_key"]
+            for i, tier in enumerate([LicenseTier.PRO_MONTHLY, LicenseTier.PRO_YEARLY, LicenseTier.ENTERPRISE] * 4)]
+    manager.admin_create_licenses_bulk(LicenseTier.PRO_MONTHLY, 30, count=5, email="team@example.com")
+    for key in keys[::3]:
+        manager.deactivate_license(key)
+    for key in keys[1::3]:
+        manager.renew_license(key)
+    manager.bulk_update_licenses("deactivate", email="team@example.com")
+
+    # A failed write still leaves the live object mutated; the counters must follow it
+    def failing_put(license_obj):
+        raise OSError("disk full")
+
+    manager.store.put = failing_put
+    manager.deactivate_license(keys[2])
+
+    check = manager.verify_population_counters()
+    assert check["consistent"], check["mismatches"]
+
+
+@pytest.mark.parametrize("storage_mode", ["journal", "sqlite"])
+def test_concurrent_mutations_keep_exact_counts(storage_mode):
+    result = run_stress(threads=16, operations=500, licenses=100, storage_mode=storage_mode)
+    assert result["errors"] == []
+    assert result["mismatches"] == []
+
+
+def test_snapshot_compaction_failure_keeps_changes_and_reports_it(tmp_path, monkeypatch):
+    store = MappedSnapshotLicenseStore(str(tmp_path / "licenses.bin"))
+    store.load()
+    try:
+        with pytest.raises(ValueError):
+            store.put(_license("K" * 65))
+        store.put(_license("A"))
+
+        write = BinaryLicenseSnapshot.write
+
+        def disk_full(path, licenses):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(BinaryLicenseSnapshot, "write", disk_full)
+        assert store.save() is False
+        assert store.get("A") is not None
+
+        monkeypatch.setattr(BinaryLicenseSnapshot, "write", write)
+        assert store.save() is True
+        assert [license_obj.license_key for license_obj in store.iter_licenses()] == ["A"]
+    finally:
+        store.close()
+
+
+def test_failed_journal_append_is_raised_and_not_applied(tmp_path):
+    store = JournaledLicenseStore(str(tmp_path / "licenses.json"), "device")
+    store.load()
+    try:
+        def failing_append(record):
+            raise OSError("No space left on device")
+
+        store.journal.append = failing_append
+        with pytest.raises(OSError):
+            store.put(_license("A"))
+        assert "A" not in store.licenses
+    finally:
+        store.close()
+
+
+def test_feature_counts_of_the_last_zero_events_is_empty(manager):
+    manager._track_feature_usage("SCALIX-PRO-DEMO-2025", "turbo_edits")
+    assert manager.usage_records.feature_counts(last=1) == {"turbo_edits": 1}
+    assert manager.usage_records.feature_counts(last=0) == {}